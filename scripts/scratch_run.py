@@ -2,6 +2,11 @@
 import asyncio
 from pathlib import Path
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
 from perp_market_microstructure_research.ingestion.adapters.binance.record_binance_depth import record_binance_depth
 
 async def main():
@@ -11,4 +16,7 @@ async def main():
         interval_ms=100,
     )
 
-asyncio.run(main())
+if uvloop is not None:
+    uvloop.run(main())
+else:
+    asyncio.run(main())
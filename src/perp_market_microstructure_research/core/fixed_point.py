@@ -21,3 +21,8 @@ def to_fp(x: str, scale: int) -> int:
 
 def normalize_level(level: list) -> Tuple[int, int]:
     return to_fp(level[0], PRICE_SCALE), to_fp(level[1], QTY_SCALE)
+
+
+def normalize_float_level(price: float, qty: float) -> Tuple[int, int]:
+    # repr() is the shortest round-tripping decimal, i.e. the exchange's value
+    return to_fp(repr(price), PRICE_SCALE), to_fp(repr(qty), QTY_SCALE)
@@ -1,4 +1,9 @@
-from perp_market_microstructure_research.core.fixed_point import normalize_level
+from perp_market_microstructure_research.core.fixed_point import (
+    normalize_float_level,
+    normalize_level,
+)
+
+COLUMNAR_LEVEL_KEYS = ("bp", "bq", "ap", "aq")
 
 
 def is_depth_delta(raw: dict) -> bool:
@@ -10,16 +15,29 @@ def is_depth_delta(raw: dict) -> bool:
         "event_ts_ms",
         "U",
         "u",
-        "b",
-        "a",
     )
     for k in required:
         if k not in raw:
             return False
-    return True
+    if "b" in raw and "a" in raw:
+        return True
+    return all(k in raw for k in COLUMNAR_LEVEL_KEYS)
 
 
 def normalize_delta(raw: dict) -> dict:
+    if "b" in raw:
+        b = [normalize_level(l) for l in raw["b"]]
+        a = [normalize_level(l) for l in raw["a"]]
+    else:
+        b = [
+            normalize_float_level(p, q)
+            for p, q in zip(raw["bp"], raw["bq"], strict=True)
+        ]
+        a = [
+            normalize_float_level(p, q)
+            for p, q in zip(raw["ap"], raw["aq"], strict=True)
+        ]
+
     return {
         "exchange": raw["exchange"],
         "symbol": raw["symbol"],
@@ -28,6 +46,6 @@ def normalize_delta(raw: dict) -> dict:
         "event_ts_ns": raw["event_ts_ms"] * 1_000_000,
         "U": raw["U"],
         "u": raw["u"],
-        "b": [normalize_level(l) for l in raw["b"]],
-        "a": [normalize_level(l) for l in raw["a"]],
+        "b": b,
+        "a": a,
     }
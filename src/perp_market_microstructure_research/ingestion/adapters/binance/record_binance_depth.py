@@ -1,13 +1,19 @@
 import asyncio
 import time
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import orjson
-import websockets
+from websockets.asyncio.client import connect
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
 
 from perp_market_microstructure_research.ingestion.writers.rotating_jsonl_writer import (
-    WriteItem,
     writer_loop,
 )
 
@@ -18,44 +24,164 @@ from perp_market_microstructure_research.ingestion.writers.rotating_jsonl_writer
 BINANCE_FSTREAM_WS = "wss://fstream.binance.com/ws"
 
 WRITE_QUEUE_MAX = 500_000
-ROTATE_GRANULARITY_SEC = 60  # one file per minute
+ROTATE_GRANULARITY_SEC = 60  # one index entry per minute, one file per hour
+BUCKET_NS = ROTATE_GRANULARITY_SEC * 1_000_000_000
 
 
 # =========================
 # TIME + BUCKETING
 # =========================
 
-def now_ns() -> int:
-    return time.time_ns()
+def wall_clock_offset_ns() -> int:
+    """
+    Offset mapping `time.perf_counter_ns()` onto wall-clock nanoseconds.
+
+    Captured once per connection so the recv loop reads only the
+    monotonic counter; re-anchoring on reconnect bounds drift.
+    """
+    return time.time_ns() - time.perf_counter_ns()
 
 
 def minute_bucket(ts_ns: int) -> int:
-    return int((ts_ns // 1_000_000_000) // 60)
+    return ts_ns // BUCKET_NS
 
 
-def minute_filename(bucket: int) -> str:
-    return f"deltas_utcmin_{bucket}.jsonl"
+def segment_filename(bucket: int) -> str:
+    hour = datetime.fromtimestamp(bucket * ROTATE_GRANULARITY_SEC, tz=timezone.utc)
+    return f"deltas.{hour:%Y%m%d%H}.jsonl"
 
 
 # =========================
 # VALIDATION
 # =========================
 
-def validate_depth_msg(msg: dict) -> None:
-    required = ["e", "E", "s", "U", "u", "b", "a"]
-    for k in required:
-        if k not in msg:
-            raise ValueError(f"Missing key {k}")
+def split_depth_frame(
+    raw: bytes, parser=None
+) -> tuple[int, int, int, memoryview, memoryview]:
+    """
+    Split a raw depth frame into (E, U, u) and the raw `b`/`a` arrays.
+
+    Only the header (everything before `"b":`) is parsed; the bid/ask
+    arrays are returned as zero-copy memoryviews into `raw` and forwarded
+    verbatim, so the level lists are neither copied nor materialized as
+    Python objects. Relies on Binance emitting `b` and `a` as the last
+    two keys of the frame.
+
+    With a reused `simdjson.Parser` the header is parsed in place and
+    only the three scalars are read out; otherwise orjson builds the
+    small header dict.
+    """
+    b_at = raw.find(b',"b":')
+    a_at = raw.find(b',"a":', b_at)
+    if b_at < 0 or a_at < 0:
+        raise ValueError("Malformed depth frame: missing b/a arrays")
+
+    if (
+        raw[b_at + 5 : b_at + 6] != b"[" or raw[a_at - 1 : a_at] != b"]"
+        or raw[a_at + 5 : a_at + 6] != b"[" or raw[-2:-1] != b"]"
+    ):
+        raise ValueError("Malformed depth frame: b/a are not trailing arrays")
+
+    view = memoryview(raw)
+    bids = view[b_at + 5 : a_at]
+    asks = view[a_at + 5 : -1]
+
+    header = raw[:b_at] + b"}"
+    if parser is None:
+        E, U, u = validate_depth_msg(orjson.loads(header))
+    else:
+        # the parsed document must not outlive this call: the parser
+        # refuses to re-parse while views into its buffer are alive
+        E, U, u = validate_depth_msg(parser.parse(header))
+    return E, U, u, bids, asks
+
+
+def validate_depth_msg(msg: dict) -> tuple[int, int, int]:
+    """
+    Extract (E, U, u) from a depth update header.
+
+    The feed is trusted, so this only probes the fields the recorder
+    consumes. Their types are checked exactly: the record encoder's `%d`
+    would otherwise truncate floats and write bools as 0/1 silently.
+    The event-type check is skipped under `python -O`.
+    """
+    try:
+        E, U, u = msg["E"], msg["U"], msg["u"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed depth message: {e!r}") from None
+
+    if not (type(E) is int and type(U) is int and type(u) is int):
+        raise ValueError(f"Non-integer depth ids: E={E!r} U={U!r} u={u!r}")
 
-    if msg["e"] != "depthUpdate":
-        raise ValueError(f"Unexpected event type: {msg['e']}")
+    if __debug__:
+        if msg.get("e") != "depthUpdate":
+            raise ValueError(f"Unexpected event type: {msg.get('e')}")
 
-    if not isinstance(msg["E"], int):
-        raise ValueError("E must be int (event time ms)")
-    if not isinstance(msg["U"], int) or not isinstance(msg["u"], int):
-        raise ValueError("U/u must be int update IDs")
-    if not isinstance(msg["b"], list) or not isinstance(msg["a"], list):
-        raise ValueError("b/a must be lists")
+    return E, U, u
+
+
+# =========================
+# RECORD ENCODING
+# =========================
+
+_RECORD_HEAD = b'%s"recv_ts_ns":%d,"event_ts_ms":%d,"U":%d,"u":%d,"b":'
+_COLUMNAR_TEMPLATE = (
+    b'%s"recv_ts_ns":%d,"event_ts_ms":%d,"U":%d,"u":%d,'
+    b'"bp":%s,"bq":%s,"ap":%s,"aq":%s}\n'
+)
+
+
+def record_prefix(symbol: str, conn_id: int) -> bytes:
+    """
+    Serialize the per-connection constant fields once.
+
+    Returns the opening of a record object up to and including the
+    comma that precedes `recv_ts_ns`.
+    """
+    head = orjson.dumps(
+        {"exchange": "binance", "symbol": symbol, "conn_id": conn_id}
+    )
+    return head[:-1] + b","
+
+
+def _binance_record_line(
+    prefix: bytes, recv_ts: int, E: int, U: int, u: int, b, a
+) -> bytes:
+    """
+    Build one newline-terminated JSONL record by splicing raw JSON.
+
+    `b` and `a` are the exchange's own array bytes (any bytes-like
+    object), copied through as-is.
+    """
+    # join takes the memoryviews as-is; %-formatting them would copy first
+    head = _RECORD_HEAD % (prefix, recv_ts, E, U, u)
+    return b"".join((head, b, b',"a":', a, b"}\n"))
+
+
+def _split_levels(levels) -> tuple[bytes, bytes]:
+    """
+    Turn a raw `[[price, qty], ...]` array into numeric price/qty columns.
+    """
+    pairs = orjson.loads(levels)
+    return (
+        orjson.dumps([float(p) for p, _ in pairs]),
+        orjson.dumps([float(q) for _, q in pairs]),
+    )
+
+
+def _binance_columnar_line(
+    prefix: bytes, recv_ts: int, E: int, U: int, u: int, b, a
+) -> bytes:
+    """
+    Build one record with levels stored as parallel float arrays.
+
+    Replaces `b`/`a` with `bp`/`bq`/`ap`/`aq`. Floats keep the exchange's
+    decimal strings exactly: their shortest repr round-trips to the
+    original value at Binance's precision.
+    """
+    bp, bq = _split_levels(b)
+    ap, aq = _split_levels(a)
+    return _COLUMNAR_TEMPLATE % (prefix, recv_ts, E, U, u, bp, bq, ap, aq)
 
 
 # =========================
@@ -67,9 +193,12 @@ async def record_binance_depth(
     symbol: str,
     out_dir: Path,
     interval_ms: int = 100,
+    zstd_level: Optional[int] = None,
+    columnar_levels: bool = False,
 ) -> None:
     """
-    Record raw Binance futures L2 depth deltas into minute-rotated JSONL files.
+    Record raw Binance futures L2 depth deltas into hourly JSONL segments
+    with a per-minute offset index.
 
     This function is an ingestion adapter:
     - exchange-specific
@@ -84,28 +213,42 @@ async def record_binance_depth(
         Directory where raw delta files will be written
     interval_ms : int
         Depth update interval (Binance supports 100ms)
+    zstd_level : int, optional
+        If set, write zstd-compressed `.jsonl.zst` files at this level
+    columnar_levels : bool
+        Store levels as numeric `bp`/`bq`/`ap`/`aq` arrays instead of the
+        exchange's raw `b`/`a` string pairs
     """
 
     stream = f"{symbol.lower()}@depth@{interval_ms}ms"
     url = f"{BINANCE_FSTREAM_WS}/{stream}"
 
-    q: asyncio.Queue = asyncio.Queue(maxsize=WRITE_QUEUE_MAX)
+    q: deque = deque()
+    q_ready = asyncio.Event()
 
     writer_task = asyncio.create_task(
         writer_loop(
             out_dir=out_dir,
-            filename_fn=minute_filename,
+            filename_fn=segment_filename,
             queue=q,
+            ready=q_ready,
+            zstd_level=zstd_level,
         )
     )
 
+    # per-message callables bound once: the recv loop runs for every frame
+    encode_line = _binance_columnar_line if columnar_levels else _binance_record_line
+    clock = time.perf_counter_ns
+    enqueue = q.append
+    wake_writer = q_ready.set
+
     backoff = 0.25
     max_backoff = 10.0
     conn_id = 0
 
     while True:
         try:
-            async with websockets.connect(
+            async with connect(
                 url,
                 ping_interval=15,
                 ping_timeout=10,
@@ -115,35 +258,32 @@ async def record_binance_depth(
                 conn_id += 1
                 backoff = 0.25
                 print(f"[binance] connected (conn_id={conn_id}) {stream}")
+                prefix = record_prefix(symbol, conn_id)
+                clock_offset = wall_clock_offset_ns()
+                parser = simdjson.Parser() if simdjson is not None else None
+                # bucket is recomputed only when recv_ts crosses its end
+                bucket = 0
+                next_bucket_ns = 0
 
                 while True:
-                    raw = await ws.recv()
-                    recv_ts = now_ns()
-
-                    msg = orjson.loads(raw)
-                    validate_depth_msg(msg)
-
-                    record = {
-                        "exchange": "binance",
-                        "symbol": symbol,
-                        "conn_id": conn_id,
-                        "recv_ts_ns": recv_ts,
-                        "event_ts_ms": msg["E"],
-                        "U": msg["U"],
-                        "u": msg["u"],
-                        "b": msg["b"],
-                        "a": msg["a"],
-                    }
-
-                    bucket = minute_bucket(recv_ts)
-                    line = orjson.dumps(record) + b"\n"
-
-                    try:
-                        q.put_nowait(WriteItem(bucket=bucket, line=line))
-                    except asyncio.QueueFull:
+                    # bytes as received: skips websockets' UTF-8 decode of
+                    # text frames; orjson validates the header it parses
+                    raw = await ws.recv(decode=False)
+                    recv_ts = clock() + clock_offset
+
+                    E, U, u, b, a = split_depth_frame(raw, parser)
+
+                    if recv_ts >= next_bucket_ns:
+                        bucket = minute_bucket(recv_ts)
+                        next_bucket_ns = (bucket + 1) * BUCKET_NS
+                    line = encode_line(prefix, recv_ts, E, U, u, b, a)
+
+                    if len(q) >= WRITE_QUEUE_MAX:
                         raise RuntimeError(
                             "Writer queue full — disk throughput insufficient; refusing to drop data."
                         )
+                    enqueue((bucket, line))
+                    wake_writer()
 
         except (asyncio.CancelledError, KeyboardInterrupt):
             break
@@ -156,5 +296,6 @@ async def record_binance_depth(
             backoff = min(max_backoff, backoff * 2)
 
     # graceful shutdown
-    await q.put(None)
+    q.append(None)
+    q_ready.set()
     await writer_task
@@ -1,9 +1,15 @@
 import asyncio
-import time
-from dataclasses import dataclass
+import contextlib
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # =========================
 # CONFIG
@@ -11,16 +17,32 @@ from typing import Optional
 
 BATCH_SIZE = 2000
 FLUSH_INTERVAL_SEC = 0.5
+BUFFER_BYTES = 8 * 1024 * 1024
+
+# index bucket of the `[bucket, offset]` line written when a segment is
+# closed; readers take it as the end of the segment's last indexed bucket
+SEGMENT_CLOSED = -1
 
 
 # =========================
 # DATA MODEL
 # =========================
 
-@dataclass
-class WriteItem:
-    bucket: int
-    line: bytes
+# (bucket, line): a plain tuple so producers skip a class call per record
+WriteItem = tuple[int, bytes]
+
+
+# =========================
+# LOW-LEVEL I/O
+# =========================
+
+def _write_all(fd: int, data) -> None:
+    """
+    Write a bytes-like object to `fd`, resuming after short writes.
+    """
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
 
 
 # =========================
@@ -29,90 +51,218 @@ class WriteItem:
 
 class RotatingJSONLWriter:
     """
-    Append-only JSONL writer with time-bucketed rotation.
+    Append-only JSONL writer with time-bucketed segments.
 
-    - One file per logical time bucket
-    - Writes to `.tmp` and atomically renames on finalize
+    - `filename_fn` maps each bucket to a segment file; consecutive
+      buckets share a segment until the name changes
+    - Each bucket start is recorded in a `<segment>.idx` sidecar as a
+      `[bucket, byte_offset]` line, so readers can seek to a bucket and
+      tail the live segment; closing a segment appends a
+      `[SEGMENT_CLOSED, size]` line, marking its last bucket complete
+    - Segments are appended in place: no per-bucket `.tmp` + rename
     - Buffered writes for throughput
+    - Optional zstd compression (`.zst` suffix): one frame per bucket,
+      block-flushed on every flush and closed when the bucket ends
     """
 
-    def __init__(self, out_dir: Path, *, filename_fn):
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        filename_fn,
+        zstd_level: Optional[int] = None,
+    ):
         self.out_dir = out_dir
         self.filename_fn = filename_fn
 
-        self.current_bucket: Optional[int] = None
-        self.fp = None
-        self.tmp_path: Optional[Path] = None
-        self.final_path: Optional[Path] = None
+        self.compressor = None
+        if zstd_level is not None:
+            if zstandard is None:
+                raise RuntimeError("zstd output requires the `zstandard` package")
+            self.compressor = zstandard.ZstdCompressor(level=zstd_level)
+        # open zstd frame for the current bucket, started on first write
+        self.frame = None
 
-        self.buffer: list[bytes] = []
-        self.last_flush: float = time.time()
+        # -1 never matches a real bucket, so rotation is a single compare
+        self.current_bucket: int = -1
+        self.segment_name: Optional[str] = None
+        self.fd: Optional[int] = None
+        self.idx_fd: Optional[int] = None
+        self.offset = 0
+        # output a failed write left unwritten; sent first on the next write
+        self.unwritten = b""
 
-    def _open_for_bucket(self, bucket: int) -> None:
-        """
-        Open a new file for the given bucket.
+        # preallocated once; records are copied in at `buf_off` and the
+        # filled prefix is written out directly, with no join
+        self.buf = bytearray(BUFFER_BYTES)
+        self.buf_off = 0
+        self.buf_records = 0
 
-        Assumes that any previous bucket has already been finalized.
+    def _open_segment(self, name: str) -> None:
+        """
+        Open (or reopen for append) the segment file and its index.
         """
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
+        path_name = f"{name}.zst" if self.compressor is not None else name
+        # append mode allows restart/reconnect safety; buffering is ours
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(self.out_dir / path_name, flags, 0o644)
+        self.idx_fd = os.open(self.out_dir / f"{path_name}.idx", flags, 0o644)
+        self.offset = os.fstat(self.fd).st_size
+        self.segment_name = name
+
+    def _start_bucket(self, bucket: int) -> None:
+        """
+        Begin a new bucket, rotating the segment if its name changes.
+
+        The buffer is flushed first so the bucket starts on a write (and,
+        when compressing, a frame) boundary at the indexed offset.
+        """
         name = self.filename_fn(bucket)
-        self.final_path = self.out_dir / name
-        self.tmp_path = self.out_dir / f"{name}.tmp"
+        if name != self.segment_name:
+            self._close_segment()
+            self._open_segment(name)
+        else:
+            self._flush()
+            self._end_frame()
 
-        # append mode allows restart/reconnect safety
-        self.fp = self.tmp_path.open("ab", buffering=1024 * 1024)
+        _write_all(self.idx_fd, b"[%d,%d]\n" % (bucket, self.offset))
         self.current_bucket = bucket
-        self.last_flush = time.time()
 
-    def _close_and_finalize(self) -> None:
+    def _write_raw(self, data) -> None:
+        if self.unwritten:
+            data = self.unwritten + bytes(data)
+            self.unwritten = b""
+        view = memoryview(data)
+        try:
+            while view:
+                n = os.write(self.fd, view)
+                self.offset += n
+                view = view[n:]
+        except OSError:
+            # keep the remainder so a retry neither drops nor repeats bytes
+            self.unwritten = bytes(view)
+            raise
+
+    def _write_out(self, data) -> None:
+        if self.compressor is not None:
+            # one frame spans the whole bucket so zstd sees large windows;
+            # a block flush makes everything written so far decodable even
+            # if the frame is never closed (crash, live tail)
+            if self.frame is None:
+                self.frame = self.compressor.compressobj()
+            data = self.frame.compress(data) + self.frame.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        self._write_raw(data)
+
+    def _end_frame(self) -> None:
         """
-        Flush buffer, close file, and atomically rename tmp → final.
+        Close the bucket's zstd frame so the next indexed offset starts a
+        new one.
         """
-        if self.fp is None:
-            return
+        if self.frame is not None:
+            self._write_raw(self.frame.flush())
+            self.frame = None
+
+    def _flush(self) -> None:
+        if self.buf_off:
+            # the buffer is handed off before writing: whatever a failed
+            # write leaves behind is kept in `unwritten`, not re-encoded
+            n = self.buf_off
+            self.buf_off = 0
+            self.buf_records = 0
+            with memoryview(self.buf) as view:
+                self._write_out(view[:n])
+        elif self.unwritten:
+            self._write_raw(b"")
+
+    def _maybe_flush(self) -> None:
+        if self.buf_records >= BATCH_SIZE:
+            self._flush()
 
-        if self.buffer:
-            self.fp.write(b"".join(self.buffer))
-            self.buffer.clear()
+    def _append(self, line: bytes) -> None:
+        end = self.buf_off + len(line)
+        if end > len(self.buf):
+            self._flush()
+            if len(line) > len(self.buf):
+                self._write_out(line)
+                return
+            end = len(line)
+        self.buf[self.buf_off : end] = line
+        self.buf_off = end
+        self.buf_records += 1
+
+    def _close_segment(self) -> None:
+        """
+        Flush buffer and close the current segment and its index.
+        """
+        if self.fd is None:
+            return
 
-        self.fp.flush()
-        # Optional durability hook (leave disabled unless needed)
-        # os.fsync(self.fp.fileno())
+        try:
+            self._flush()
+            self._end_frame()
+            _write_all(self.idx_fd, b"[%d,%d]\n" % (SEGMENT_CLOSED, self.offset))
+            # Optional durability hook (leave disabled unless needed)
+            # os.fsync(self.fd)
 
-        self.fp.close()
-        self.tmp_path.replace(self.final_path)
+            # closed segments are only read back later by the normalizer;
+            # drop their already written-back pages rather than keep them
+            # cached
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            # a failed final write must not leak the descriptors
+            os.close(self.fd)
+            os.close(self.idx_fd)
 
-        self.fp = None
-        self.current_bucket = None
-        self.tmp_path = None
-        self.final_path = None
+            self.fd = None
+            self.idx_fd = None
+            self.unwritten = b""
+            self.segment_name = None
+            self.current_bucket = -1
 
-    def write(self, item: WriteItem) -> None:
+    def write(self, bucket: int, line: bytes) -> None:
         """
         Write a single record.
 
         Buckets are assumed to be monotonic or discontinuous jumps;
         no attempt is made to backfill missing buckets.
         """
-        if self.current_bucket is None or item.bucket != self.current_bucket:
-            self._close_and_finalize()
-            self._open_for_bucket(item.bucket)
-
-        self.buffer.append(item.line)
-
-        now = time.time()
-        if (
-            len(self.buffer) >= BATCH_SIZE
-            or (now - self.last_flush) >= FLUSH_INTERVAL_SEC
-        ):
-            self.fp.write(b"".join(self.buffer))
-            self.fp.flush()
-            self.buffer.clear()
-            self.last_flush = now
+        if bucket != self.current_bucket:
+            self._start_bucket(bucket)
+
+        self._append(line)
+        self._maybe_flush()
+
+    def write_many(self, items: list[WriteItem]) -> None:
+        """
+        Write a batch of records.
+
+        Same-bucket runs are appended to the buffer back to back; a bucket
+        change flushes and indexes the new bucket. The batch-size threshold is
+        checked once per batch rather than once per record.
+        """
+        for bucket, line in items:
+            if bucket != self.current_bucket:
+                self._start_bucket(bucket)
+            self._append(line)
+
+        self._maybe_flush()
+
+    def flush(self) -> None:
+        """
+        Write out everything buffered so far.
+
+        Time-based flushing is driven from outside (see `writer_loop`), so
+        the per-record path only checks the buffered record count.
+        """
+        self._flush()
 
     def close(self) -> None:
-        self._close_and_finalize()
+        self._close_segment()
 
 
 # =========================
@@ -123,21 +273,68 @@ async def writer_loop(
     *,
     out_dir: Path,
     filename_fn,
-    queue: asyncio.Queue,
+    queue: deque,
+    ready: asyncio.Event,
+    zstd_level: Optional[int] = None,
 ) -> None:
     """
     Async consumer loop for WriteItem events.
 
+    Single-producer/single-consumer handoff: the producer appends to
+    `queue` and sets `ready`; each wakeup drains the whole deque in one
+    pass, so a burst of frames costs one event-loop round-trip.
+
+    All file I/O runs on a dedicated single-thread executor that owns the
+    writer, so flushes never block the event loop and disk latency
+    overlaps with receiving the next batch. A timer task flushes every
+    FLUSH_INTERVAL_SEC through the same executor, which keeps clock reads
+    off the per-record path and bounds latency when the stream goes quiet.
+    A failed timed flush is reported and retried on the next tick; the
+    writer is closed on every exit path.
+
     Terminates cleanly on `None` sentinel.
     """
-    writer = RotatingJSONLWriter(out_dir, filename_fn=filename_fn)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jsonl-writer")
+    writer = RotatingJSONLWriter(
+        out_dir, filename_fn=filename_fn, zstd_level=zstd_level
+    )
+
+    async def flush_periodically() -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SEC)
+            try:
+                await loop.run_in_executor(executor, writer.flush)
+            except Exception as e:
+                # report now and keep the timer alive; the buffer is kept,
+                # so the next tick (or close) retries the write
+                print(f"[writer] timed flush failed: {type(e).__name__}: {e}")
+
+    flusher = asyncio.create_task(flush_periodically())
     try:
         while True:
-            item = await queue.get()
-            if item is None:
-                queue.task_done()
+            while not queue:
+                ready.clear()
+                await ready.wait()
+
+            batch = list(queue)
+            queue.clear()
+
+            done = batch[-1] is None
+            if done:
+                batch.pop()
+
+            await loop.run_in_executor(executor, writer.write_many, batch)
+
+            if done:
                 break
-            writer.write(item)
-            queue.task_done()
     finally:
-        writer.close()
+        flusher.cancel()
+        try:
+            with contextlib.suppress(asyncio.CancelledError):
+                await flusher
+        finally:
+            try:
+                await loop.run_in_executor(executor, writer.close)
+            finally:
+                executor.shutdown(wait=False)
@@ -1,20 +1,170 @@
+import io
 import json
 import time
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
 
 import orjson
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from perp_market_microstructure_research.core.schemas.l2_delta import (
     is_depth_delta,
     normalize_delta,
 )
+from perp_market_microstructure_research.ingestion.writers.rotating_jsonl_writer import (
+    SEGMENT_CLOSED,
+)
 from perp_market_microstructure_research.validation.audit import Audit
 from perp_market_microstructure_research.validation.continuity import continuity_ok
 
 
-def list_raw_files(raw_dir: Path):
-    return sorted(p for p in raw_dir.glob("deltas_utcmin_*.jsonl") if p.is_file())
+# fallback for a dead recorder: an unclosed segment's last indexed minute
+# counts as complete once the segment has not been modified for this long
+SEGMENT_STALE_SEC = 3600
+
+READ_CHUNK_BYTES = 4 << 20
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+WHOLE_FILE = ((0, None),)
+
+
+class RawSlice(NamedTuple):
+    """One minute of raw deltas: a whole legacy file or segment ranges."""
+
+    stem: str
+    path: Path
+    ranges: tuple[tuple[int, Optional[int]], ...]
+
+
+def read_segment_index(idx_file: Path) -> list[tuple[int, int]]:
+    """
+    Read `[bucket, offset]` entries, skipping a torn trailing line.
+    """
+    entries = []
+    with idx_file.open("rb") as f:
+        for line in f:
+            try:
+                bucket, offset = orjson.loads(line)
+            except (orjson.JSONDecodeError, ValueError, TypeError):
+                continue
+            entries.append((bucket, offset))
+    return entries
+
+
+def segment_slices(segment: Path, superseded: bool = False) -> list[RawSlice]:
+    """
+    Split an hourly segment into per-minute byte ranges using its index.
+
+    Each index entry's range ends where the next entry starts. A minute
+    indexed more than once (recorder restarts, or the wall clock stepping
+    back on re-anchor) gets all of its ranges, in file order.
+
+    Completeness follows the writer's progress, not the reader's clock:
+    a minute is complete once any index entry follows it, including the
+    SEGMENT_CLOSED marker. The last entry is otherwise still being
+    written and is skipped, unless a later segment exists (`superseded`)
+    or the segment has been idle for SEGMENT_STALE_SEC. Its range ends
+    at the segment size taken *before* the index is read: the recorder
+    indexes a minute before writing its data, so that bound never covers
+    an unindexed minute appended later.
+    """
+    idx_file = segment.with_name(f"{segment.name}.idx")
+    if not idx_file.is_file():
+        return []
+
+    st = segment.stat()
+    entries = read_segment_index(idx_file)
+    if not entries:
+        return []
+
+    ranges: dict[int, list[tuple[int, int]]] = {}
+    for (bucket, start), (_, end) in zip(entries, entries[1:] + [(None, st.st_size)]):
+        if bucket != SEGMENT_CLOSED:
+            ranges.setdefault(bucket, []).append((start, end))
+
+    last_bucket = entries[-1][0]
+    if (
+        last_bucket != SEGMENT_CLOSED
+        and not superseded
+        and time.time() - st.st_mtime < SEGMENT_STALE_SEC
+    ):
+        del ranges[last_bucket]
+
+    return [
+        RawSlice(f"deltas_utcmin_{bucket}", segment, tuple(r))
+        for bucket, r in ranges.items()
+    ]
+
+
+def list_raw_files(raw_dir: Path) -> list[RawSlice]:
+    """
+    Enumerate raw minutes: legacy per-minute files and indexed segments.
+    """
+    slices = [
+        RawSlice(p.stem, p, WHOLE_FILE)
+        for p in raw_dir.glob("deltas_utcmin_*.jsonl")
+        if p.is_file()
+    ]
+    segments = [
+        p
+        for pattern in ("deltas.*.jsonl", "deltas.*.jsonl.zst")
+        for p in raw_dir.glob(pattern)
+        if p.is_file()
+    ]
+    # segments are named `deltas.YYYYMMDDHH.jsonl[.zst]`; the recorder has
+    # moved past every hour but the newest
+    newest = max((p.name.split(".")[1] for p in segments), default=None)
+    for segment in segments:
+        superseded = segment.name.split(".")[1] < newest
+        slices.extend(segment_slices(segment, superseded))
+    return sorted(slices)
+
+
+def open_raw(path: Path, ranges=WHOLE_FILE):
+    """
+    Open a raw delta file (or the concatenation of its `[start, end)`
+    byte ranges) for line iteration, decompressing `.zst` segments.
+
+    In compressed segments each indexed range is exactly one zstd frame,
+    so ranges are decoded independently; a frame left unclosed by a
+    crash still yields every block flushed before it.
+    """
+    # only legacy per-minute files, always plain, are read whole
+    if ranges == WHOLE_FILE:
+        return path.open("rb")
+
+    compressed = path.suffix == ".zst"
+    if compressed and zstandard is None:
+        raise RuntimeError(f"{path.name}: reading .zst requires `zstandard`")
+
+    parts = []
+    with path.open("rb") as src:
+        for start, end in ranges:
+            src.seek(start)
+            data = src.read(end - start)
+            if compressed:
+                data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+            parts.append(data)
+    return io.BytesIO(b"".join(parts))
+
+
+def iter_lines(fin):
+    """
+    Yield lines (without their newline) from `fin`, reading it in
+    READ_CHUNK_BYTES chunks instead of one readline per record.
+    """
+    tail = b""
+    while chunk := fin.read(READ_CHUNK_BYTES):
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
 
 
 def process_raw_dir(raw_dir: Path) -> None:
@@ -27,8 +177,7 @@ def process_raw_dir(raw_dir: Path) -> None:
     norm_dir.mkdir(parents=True, exist_ok=True)
     audit_dir.mkdir(parents=True, exist_ok=True)
 
-    for raw_file in list_raw_files(raw_dir):
-        stem = raw_file.stem
+    for stem, raw_file, ranges in list_raw_files(raw_dir):
         norm_file = norm_dir / f"{stem}.fp.jsonl"
         audit_file = audit_dir / f"{stem}.audit.json"
 
@@ -38,8 +187,11 @@ def process_raw_dir(raw_dir: Path) -> None:
         audit = Audit()
         prev_u: Optional[int] = None
 
-        with raw_file.open("rb") as fin, norm_file.open("wb") as fnorm:
-            for line in fin:
+        with (
+            open_raw(raw_file, ranges) as fin,
+            norm_file.open("wb", buffering=WRITE_BUFFER_BYTES) as fnorm,
+        ):
+            for line in iter_lines(fin):
                 audit.raw_lines += 1
 
                 try:
@@ -75,12 +227,13 @@ def process_raw_dir(raw_dir: Path) -> None:
                 else:
                     prev_u = u
 
-                fnorm.write(orjson.dumps(d) + b"\n")
+                fnorm.write(orjson.dumps(d, option=orjson.OPT_APPEND_NEWLINE))
 
         with audit_file.open("w", encoding="utf-8") as fa:
             json.dump(
                 {
                     "raw_file": str(raw_file),
+                    "raw_ranges": ranges,
                     "normalized_file": str(norm_file),
                     "created_at_unix": int(time.time()),
                     "stats": audit.__dict__,